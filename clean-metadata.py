@@ -13,7 +13,7 @@ print(metadata_files)
 def clean_df(df):
     for col in df.columns:
         df[col] = df[col].astype("string")
-        df[col] = df[col].apply(lambda x: html.unescape(x) if pd.notnull(x) else x)
+        df[col] = df[col].map(html.unescape, na_action="ignore")
         df[col] = df[col].str.strip(" \n\t\r")
         df[col] = df[col].str.replace("\n\t\r", " ")
         # replace multiple spaces with single space
@@ -37,34 +37,37 @@ def process_judgment_links(df):
     expl_df["temp_link"] = clean_df(expl_df[["temp_links"]])
     expl_df = expl_df.drop(columns=["temp_links"])
     # assert all rows contain temp_link with .pdf
-    assert expl_df["temp_link"].str.contains(".pdf").all()
+    assert expl_df["temp_link"].str.contains(".pdf", regex=False).all()
 
     # strip anything after the string ".pdf" in the temp_link column
-    expl_df["temp_link"] = expl_df["temp_link"].str.extract(r"(.+?\.pdf)", expand=False)
+    expl_df["temp_link"] = expl_df["temp_link"].str.extract(r"^(.+?\.pdf)", expand=False)
     # extract language
     # prefix all temp_link that with judis with "jonew/"
     expl_df.reset_index(drop=True, inplace=True)
     mask = expl_df["temp_link"].str.startswith("judis")
     expl_df.loc[mask, "temp_link"] = "jonew/" + expl_df.loc[mask, "temp_link"]
     expl_df["language"] = expl_df["temp_link"].str.extract(
-        r"_([A-Z]+).pdf", expand=False
+        r"_([A-Z]+)\.pdf$", expand=False
     )
     # assert all rows that have language to contain "vernacular" also in the temp_link column and vice versa
     assert (
-        expl_df["language"].notnull() == expl_df["temp_link"].str.contains("vernacular")
+        expl_df["language"].notnull() == expl_df["temp_link"].str.contains("vernacular", regex=False)
     ).all(), "vernacular should be part of the url if language is present"
 
     return expl_df
 
 
-all_df = pd.DataFrame()
-
+dfs = []
 for mf in metadata_files:
     with open(mf, "r") as f:
         fjson = json.load(f)
-        df = pd.DataFrame.from_dict(fjson["data"])
-        all_df = pd.concat([all_df, df], ignore_index=True)
+        dfs.append(pd.DataFrame.from_dict(fjson["data"]))
+# concat once at the end, concatenating inside the loop re-copies every row read so far on each file
+all_df = pd.concat(dfs, ignore_index=True)
 all_df = clean_df(all_df)
 all_df = process_judgment_links(all_df)
 Path(csv_out_dir).mkdir(parents=True, exist_ok=True)
-all_df.to_csv(Path(csv_out_dir) / "judgments.csv", index=False)
+csv_out_path = Path(csv_out_dir) / "judgments.csv"
+tmp_csv_path = csv_out_path.with_suffix(".csv.tmp")
+all_df.to_csv(tmp_csv_path, index=False)
+tmp_csv_path.replace(csv_out_path)
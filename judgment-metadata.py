@@ -1,4 +1,4 @@
-import os, sys
+import os
 import json
 import requests
 from datetime import datetime
@@ -8,6 +8,8 @@ from pathlib import Path
 
 
 base_url = "https://scourtapp.nic.in"
+# one session for the whole run so consecutive interval requests reuse the same TLS connection
+session = requests.Session()
 output_dir = Path("./data/metadata/raw/")
 # read auth token from env
 AUTH_TOKEN = os.environ.get("AUTH_TOKEN")
@@ -15,32 +17,28 @@ assert AUTH_TOKEN, "AUTH_TOKEN not found in environment variables"
 
 
 def get_year_intervals():
-    starting_date = datetime(1950, 1, 1)
     intervals = [("01-01-1900", "31-12-1949")]
     # create interval for each 10 years until 2009
     for i in range(1950, 2010, 10):
-        start = datetime(i, 1, 1).strftime("%d-%m-%Y")
-        end = datetime(i + 9, 12, 31).strftime("%d-%m-%Y")
-        intervals.append((start, end))
+        intervals.append((f"01-01-{i}", f"31-12-{i + 9}"))
 
     # 1 year interval from 2010 on till 2023
     for i in range(2010, 2024):
-        start = datetime(i, 1, 1).strftime("%d-%m-%Y")
-        end = datetime(i, 12, 31).strftime("%d-%m-%Y")
-        intervals.append((start, end))
+        intervals.append((f"01-01-{i}", f"31-12-{i}"))
 
     # 1 month interval from 2024 till current date
-    current_year = datetime.now().year
+    # read the clock once so year and month can't straddle midnight on 31st Dec
+    now = datetime.now()
+    current_year = now.year
     for i in range(2024, current_year + 1):
         if i == current_year:
-            end_month = datetime.now().month
+            end_month = now.month
         else:
             end_month = 12
         for j in range(1, end_month + 1):
-            start = datetime(i, j, 1).strftime("%d-%m-%Y")
             # gets end date of the month accounting of leap years, feb month etc
-            end = datetime(i, j, calendar.monthrange(i, j)[1]).strftime("%d-%m-%Y")
-            intervals.append((start, end))
+            last_day = calendar.monthrange(i, j)[1]
+            intervals.append((f"01-{j:02d}-{i}", f"{last_day}-{j:02d}-{i}"))
 
     return intervals
 
@@ -65,7 +63,7 @@ def get_judgment_metadata(from_date: str, to_date: str):
         "judgename": "99999",
     }
 
-    response = requests.post(base_url + "/?pageid=100001", headers=headers, data=data)
+    response = session.post(base_url + "/?pageid=100001", headers=headers, data=data)
     if response.status_code != 200:
         print(
             f"Failed to get metadata for {from_date} to {to_date}, err: {response.text}"
@@ -75,7 +73,8 @@ def get_judgment_metadata(from_date: str, to_date: str):
     out_path = output_dir / file_name
     try:
         # server is returning the sql query + actual response as a response some times. Refer faulty-reponse.json file
-        response_json = response.text.split("group by diary_no")[-1]
+        # parse the raw bytes, response.text may run charset detection over the whole multi-MB body first
+        response_json = response.content.rpartition(b"group by diary_no")[2]
         metadata = json.loads(response_json)
     except Exception as e:
         print(f"Failed to parse response: {response.text}")
@@ -85,11 +84,14 @@ def get_judgment_metadata(from_date: str, to_date: str):
             f"No metadata found for {from_date} to {to_date}, response: {response.text}"
         )
         return
-    with open(out_path, "w") as f:
-        metadata = basic_clean(metadata)
+    metadata = basic_clean(metadata)
+    # write to a temp file and swap it in, so an interrupted run can't leave a truncated file behind to be committed
+    tmp_path = out_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
         json.dump(metadata, f, indent=4)
-        print(f"Metadata saved to {file_name}")
-    return response.text
+    tmp_path.replace(out_path)
+    print(f"Metadata saved to {file_name}")
+    return metadata
 
 
 def run():